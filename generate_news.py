@@ -4,8 +4,9 @@ generate_news.py
 -----------------
 This script downloads the latest items from an RSS feed and generates two
 static HTML pages (`news.html` for English and `news-fa.html` for Farsi)
-inside the `hotel_website` directory.  It uses Python's built‑in
-`xml.etree.ElementTree` library to parse the RSS XML and builds simple
+inside the `hotel_website` directory.  It parses the RSS XML with `lxml`
+when it is installed (falling back to Python's built‑in
+`xml.etree.ElementTree` otherwise) and builds simple
 Bootstrap‑styled pages containing the article title, publication date, a
 thumbnail (when available) and a short description that links back to
 the original source.  Running this script regularly (for example via a
@@ -17,35 +18,197 @@ script; however, interface text such as headings and button labels are
 translated manually below.
 """
 
+import functools
+import gzip
+import hashlib
 import html
+import json
 import os
+import re
+import urllib.error
 import urllib.request
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from email.utils import parsedate_to_datetime
 from datetime import datetime
+from typing import Optional
+
+try:
+    # lxml is a libxml2-backed drop-in replacement for ElementTree and is
+    # considerably faster; it is optional.
+    from lxml import etree as ET
+    # Drop whitespace-only text nodes, never resolve (external) entities and
+    # only report item nodes so the other elements never reach Python
+    _PARSE_OPTIONS = {'huge_tree': False, 'remove_blank_text': True, 'resolve_entities': False,
+                      'tag': 'item'}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _PARSE_OPTIONS = {}
 
 
 FEED_URL = "https://www.hospitalitynet.org/news/global.xml"
 # Number of articles to display on the news page
 ARTICLE_LIMIT = 10
+# Sidecar file (next to this script) remembering the validators of the last
+# successful download so unchanged feeds can be skipped
+CACHE_FILENAME = '.news_cache.json'
+# The feed uses namespaces for media tags; the media:content tag in Clark
+# notation can be looked up directly without resolving a prefix per item
+_MEDIA_CONTENT = '{http://search.yahoo.com/mrss/}content'
+# Image URLs must be absolute http(s) URLs with a host; anything else would
+# only make the browser issue a request that is bound to fail
+_URL_RE = re.compile(r'^https?://[^\s"<>/?#][^\s"<>]*$')
+
+
+def load_cache(path: str) -> dict:
+    """Load the feed cache from disk.
+
+    Args:
+        path (str): Location of the JSON cache file.
+
+    Returns:
+        dict: The cached metadata, or an empty dict when the file is missing
+            or unreadable.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
 
+def write_atomic(path: str, data: str) -> None:
+    """Write text to ``path`` atomically (write to a temp file, then rename).
+
+    Args:
+        path (str): Destination file.
+        data (str): Text to write.
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_cache(path: str, cache: dict) -> None:
+    """Persist the feed cache to disk atomically.
+
+    Args:
+        path (str): Location of the JSON cache file.
+        cache (dict): Metadata to store.
+    """
+    write_atomic(path, json.dumps(cache, indent=2, sort_keys=True))
+
+
+def generator_fingerprint() -> str:
+    """Fingerprint this script so pages are rebuilt after it is edited.
+
+    Changes to e.g. ``ARTICLE_LIMIT`` or the templates do not touch the feed,
+    so the feed validators alone cannot tell that the pages are stale.
+
+    Returns:
+        str: SHA-256 hex digest of this file's source.
+    """
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
-def fetch_feed(url: str) -> bytes:
+
+def pages_match_cache(cache: dict, en_path: str, fa_path: str) -> bool:
+    """Check that the generated pages recorded in the cache are still on disk.
+
+    Args:
+        cache (dict): Metadata from the previous run.
+        en_path (str): Location of the English page.
+        fa_path (str): Location of the Farsi page.
+
+    Returns:
+        bool: ``True`` if both pages exist and their modification times match
+            the ones stored in the cache.
+    """
+    try:
+        return (os.stat(en_path).st_mtime_ns == cache.get('en_html')
+                and os.stat(fa_path).st_mtime_ns == cache.get('fa_html'))
+    except OSError:
+        return False
+
+
+def fetch_feed(url: str, cache: Optional[dict] = None) -> tuple[Optional[bytes], dict]:
     """Retrieve the XML content of the RSS feed from the given URL.
 
     Many servers block generic Python user agents.  To increase the chance of
     retrieving the feed successfully we spoof a common browser user agent.
 
+    When ``cache`` holds the ``etag``/``last_modified`` validators of a
+    previous download they are sent as ``If-None-Match`` /
+    ``If-Modified-Since`` so the server can answer with ``304 Not Modified``
+    instead of resending the whole feed.  The feed is requested gzip
+    compressed and decompressed here.
+
     Args:
         url (str): URL pointing to the RSS feed.
+        cache (dict, optional): Metadata from the previous run.
 
     Returns:
-        bytes: Raw XML data returned by the server.
+        tuple[bytes | None, dict]: Raw XML data returned by the server (or
+            ``None`` if the feed has not changed) and the updated cache
+            metadata.
     """
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"}
+    cache = dict(cache or {})
+    headers = {
+        "User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+        # RSS compresses well; urllib does not decode it for us, see below
+        "Accept-Encoding": "gzip",
+    }
+    if cache.get('etag'):
+        headers["If-None-Match"] = cache['etag']
+    if cache.get('last_modified'):
+        headers["If-Modified-Since"] = cache['last_modified']
     req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req) as response:
-        return response.read()
+    try:
+        with urllib.request.urlopen(req) as response:
+            feed_data = response.read()
+            if response.headers.get('Content-Encoding', '').lower() in ('gzip', 'x-gzip'):
+                feed_data = gzip.decompress(feed_data)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return None, cache
+        raise
+    # Only keep validators the server actually sent this time
+    cache.pop('etag', None)
+    cache.pop('last_modified', None)
+    if etag:
+        cache['etag'] = etag
+    if last_modified:
+        cache['last_modified'] = last_modified
+    return feed_data, cache
+
+
+@functools.lru_cache(maxsize=64)
+def _fmt_pubdate(raw: str) -> str:
+    """Format an RFC 2822 ``pubDate`` as a human readable date.
+
+    Feeds often contain many items with identical timestamps, so results are
+    memoised on the raw string.
+
+    Args:
+        raw (str): The ``pubDate`` value as found in the feed.
+
+    Returns:
+        str: The date formatted as e.g. ``20 September 2025``, or ``raw``
+            unchanged if it cannot be parsed.
+    """
+    try:
+        return parsedate_to_datetime(raw).strftime('%d %B %Y')
+    except Exception:
+        return raw
 
 
 def parse_items(feed_data: bytes, limit: int = ARTICLE_LIMIT):
@@ -58,32 +221,27 @@ def parse_items(feed_data: bytes, limit: int = ARTICLE_LIMIT):
     Returns:
         list[dict]: A list of dictionaries containing article metadata.
     """
-    # Parse the XML data.  The feed uses namespaces for media tags, so we
-    # register the namespace so ElementTree can find them correctly.
-    ns = {
-        'media': 'http://search.yahoo.com/mrss/'
-    }
-    root = ET.fromstring(feed_data)
     items = []
-    # Traverse all item nodes under channel.  Each item corresponds to a news
-    # article.
-    for item in root.findall('./channel/item'):
+    # Stream through the document instead of building the whole tree; every
+    # completed item node corresponds to a news article and the rest of the
+    # feed is never parsed once the limit is reached.
+    context = ET.iterparse(BytesIO(feed_data), events=('end',), **_PARSE_OPTIONS)
+    for _event, item in context:
+        # lxml already filters on the tag; ElementTree reports every element
+        if item.tag != 'item':
+            continue
         title = item.findtext('title', default='').strip()
         link = item.findtext('link', default='').strip()
         description = item.findtext('description', default='').strip()
         pub_date_raw = item.findtext('pubDate', default='')
-        # Attempt to parse the publication date into a human readable format
-        try:
-            dt = parsedate_to_datetime(pub_date_raw)
-            # Use a fixed date format (e.g. 20 September 2025)
-            date_str = dt.strftime('%d %B %Y')
-        except Exception:
-            date_str = pub_date_raw
+        date_str = _fmt_pubdate(pub_date_raw)
         # Find the first media:content element to extract an image URL
         image_url = None
-        media_content = item.find('media:content', ns)
+        media_content = item.find(_MEDIA_CONTENT)
         if media_content is not None:
-            image_url = media_content.attrib.get('url')
+            image_url = (media_content.attrib.get('url') or '').strip()
+        if image_url and not _URL_RE.match(image_url):
+            image_url = None
         items.append({
             'title': html.escape(title),
             'link': html.escape(link),
@@ -91,65 +249,86 @@ def parse_items(feed_data: bytes, limit: int = ARTICLE_LIMIT):
             'date': html.escape(date_str),
             'image': html.escape(image_url) if image_url else None
         })
+        # Free the processed item so memory stays bounded; lxml also lets us
+        # drop the (already cleared) siblings left behind in the channel.
+        item.clear()
+        if hasattr(item, 'getprevious'):
+            while item.getprevious() is not None:
+                del item.getparent()[0]
         # Respect the limit
         if len(items) >= limit:
             break
     return items
 
 
-def build_html(items: list[dict], lang: str = 'en') -> str:
-    """Build the complete HTML document for the news page.
+# Static translations for interface elements, filled into the page template
+_TRANS_EN = {
+    'html_lang': 'en',
+    'dir_attr': 'ltr',
+    'brand': 'HotelNews',
+    'title': 'Latest Articles',
+    'description': 'Hand‑curated news and articles from trusted hospitality and tourism sources.',
+    'home': 'Home',
+    'home_href': 'index.html',
+    'news': 'Latest Articles',
+    'features': 'Features',
+    'about': 'About',
+    'switch_lang': 'فارسی',
+    'switch_href': 'index-fa.html',
+    'rights': 'All rights reserved.',
+    'read_more': 'Read More',
+}
+_TRANS_FA = {
+    'html_lang': 'fa',
+    'dir_attr': 'rtl',
+    'brand': 'هتل نیوز',
+    'title': 'آخرین اخبار و مقالات',
+    'description': 'تمامی اخبار از منابع معتبر هتلداری و گردشگری در این بخش گردآوری شده است.',
+    'home': 'خانه',
+    'home_href': 'index-fa.html',
+    'news': 'مقالات',
+    'features': 'ویژگی‌ها',
+    'about': 'درباره ما',
+    'switch_lang': 'English',
+    'switch_href': 'index.html',
+    'rights': 'تمام حقوق محفوظ است.',
+    'read_more': 'بیشتر بخوانید',
+}
+
+# Fixed parts of the article card markup, shared by every card and language
+_CARD_OPEN = '<div class="col-md-6 col-lg-4 mb-4">\n<div class="card h-100 shadow-sm">\n'
+_CARD_BODY_OPEN = '<div class="card-body">\n'
+_LINK_CLOSE = '</a>\n'
+_CARD_CLOSE = '</div>\n</div>\n</div>'
+
+
+def _card_parts(art: dict) -> tuple[str, str, str]:
+    """Render the language independent parts of an article card.
 
     Args:
-        items (list[dict]): List of article dictionaries to display.
-        lang (str): Language code ('en' or 'fa').  Determines text direction
-            and interface translations.
+        art (dict): Article metadata as returned by :func:`parse_items`.
 
     Returns:
-        str: A complete HTML document as a string.
+        tuple[str, str, str]: The image line (empty when the article has no
+            image), the title/date/description lines and the opening tag of
+            the "Read More" link.
     """
-    rtl = lang == 'fa'
-    html_lang = 'fa' if rtl else 'en'
-    dir_attr = 'rtl' if rtl else 'ltr'
-    # Static translations for interface elements
-    trans = {
-        'title': 'آخرین اخبار و مقالات' if rtl else 'Latest Articles',
-        'description': 'تمامی اخبار از منابع معتبر هتلداری و گردشگری در این بخش گردآوری شده است.' if rtl else 'Hand‑curated news and articles from trusted hospitality and tourism sources.',
-        'home': 'خانه' if rtl else 'Home',
-        'news': 'مقالات' if rtl else 'Latest Articles',
-        'features': 'ویژگی‌ها' if rtl else 'Features',
-        'about': 'درباره ما' if rtl else 'About',
-        'switch_lang': 'English' if rtl else 'فارسی',
-        'switch_href': 'index.html' if rtl else 'index-fa.html'
-    }
-    # Build each article card
-    cards_html = []
-    for art in items:
-        card = []
-        card.append('<div class="col-md-6 col-lg-4 mb-4">')
-        card.append('<div class="card h-100 shadow-sm">')
-        # If an image is available, include it
-        if art['image']:
-            card.append(f'<img src="{art["image"]}" class="card-img-top" alt="News image">')
-        card.append('<div class="card-body">')
-        card.append(f'<h5 class="card-title">{art["title"]}</h5>')
-        card.append(f'<p class="card-text small text-muted">{art["date"]}</p>')
-        card.append(f'<p class="card-text">{art["description"]}</p>')
-        card.append(f'<a href="{art["link"]}" target="_blank" class="btn btn-primary btn-sm">' + ('بیشتر بخوانید' if rtl else 'Read More') + '</a>')
-        card.append('</div>')  # card-body
-        card.append('</div>')  # card
-        card.append('</div>')  # col
-        cards_html.append('\n'.join(card))
-    cards_joined = '\n'.join(cards_html)
-    # Construct the full HTML page
-    return f"""
+    img = f'<img src="{art["image"]}" class="card-img-top" alt="News image">\n' if art['image'] else ''
+    body = (f'<h5 class="card-title">{art["title"]}</h5>\n'
+            f'<p class="card-text small text-muted">{art["date"]}</p>\n'
+            f'<p class="card-text">{art["description"]}</p>\n')
+    link_open = f'<a href="{art["link"]}" target="_blank" class="btn btn-primary btn-sm">'
+    return img, body, link_open
+
+
+_PAGE_TMPL = """
 <!DOCTYPE html>
 <html lang="{html_lang}" dir="{dir_attr}">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>{trans['title']} | HotelNews</title>
-  <meta name="description" content="{trans['description']}">
+  <title>{title} | HotelNews</title>
+  <meta name="description" content="{description}">
   <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css">
   <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/bootstrap-icons.css">
   <link rel="stylesheet" href="styles.css">
@@ -157,37 +336,37 @@ def build_html(items: list[dict], lang: str = 'en') -> str:
 <body>
   <nav class="navbar navbar-expand-lg navbar-light bg-light shadow-sm">
     <div class="container">
-      <a class="navbar-brand fw-bold" href="#">{'هتل نیوز' if rtl else 'HotelNews'}</a>
+      <a class="navbar-brand fw-bold" href="#">{brand}</a>
       <button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#navbarNav" aria-controls="navbarNav" aria-expanded="false" aria-label="Toggle navigation">
         <span class="navbar-toggler-icon"></span>
       </button>
       <div class="collapse navbar-collapse" id="navbarNav">
         <ul class="navbar-nav ms-auto">
-          <li class="nav-item"><a class="nav-link" href="{'index-fa.html' if rtl else 'index.html'}">{trans['home']}</a></li>
-          <li class="nav-item"><a class="nav-link active" aria-current="page" href="#">{trans['news']}</a></li>
-          <li class="nav-item"><a class="nav-link" href="{'index-fa.html#features' if rtl else 'index.html#features'}">{trans['features']}</a></li>
-          <li class="nav-item"><a class="nav-link" href="{'index-fa.html#about' if rtl else 'index.html#about'}">{trans['about']}</a></li>
-          <li class="nav-item"><a class="nav-link" href="{trans['switch_href']}">{trans['switch_lang']}</a></li>
+          <li class="nav-item"><a class="nav-link" href="{home_href}">{home}</a></li>
+          <li class="nav-item"><a class="nav-link active" aria-current="page" href="#">{news}</a></li>
+          <li class="nav-item"><a class="nav-link" href="{home_href}#features">{features}</a></li>
+          <li class="nav-item"><a class="nav-link" href="{home_href}#about">{about}</a></li>
+          <li class="nav-item"><a class="nav-link" href="{switch_href}">{switch_lang}</a></li>
         </ul>
       </div>
     </div>
   </nav>
   <header class="bg-primary text-white py-5">
     <div class="container text-center">
-      <h1 class="fw-bold">{trans['title']}</h1>
-      <p class="lead">{trans['description']}</p>
+      <h1 class="fw-bold">{title}</h1>
+      <p class="lead">{description}</p>
     </div>
   </header>
   <main class="py-4">
     <div class="container">
       <div class="row">
-        {cards_joined}
+        {cards}
       </div>
     </div>
   </main>
   <footer class="bg-dark text-white py-3">
     <div class="container d-flex justify-content-between align-items-center">
-      <span>&copy; 2025 HotelNews. {'تمام حقوق محفوظ است.' if rtl else 'All rights reserved.'}</span>
+      <span>&copy; 2025 HotelNews. {rights}</span>
       <span><a href="#" class="text-white me-2"><i class="bi bi-facebook"></i></a><a href="#" class="text-white me-2"><i class="bi bi-twitter"></i></a><a href="#" class="text-white"><i class="bi bi-instagram"></i></a></span>
     </div>
   </footer>
@@ -205,23 +384,92 @@ def build_html(items: list[dict], lang: str = 'en') -> str:
 """
 
 
+def _build_page(cards: list[tuple[str, str, str]], trans: dict) -> str:
+    """Assemble one news page from pre-rendered card parts.
+
+    Args:
+        cards (list[tuple[str, str, str]]): Card parts as returned by
+            :func:`_card_parts`, one entry per article.
+        trans (dict): Interface translations (``_TRANS_EN`` or ``_TRANS_FA``).
+
+    Returns:
+        str: A complete HTML document as a string.
+    """
+    read_more = trans['read_more']
+    cards_joined = '\n'.join(
+        ''.join((_CARD_OPEN, img, _CARD_BODY_OPEN, body, link_open, read_more, _LINK_CLOSE, _CARD_CLOSE))
+        for img, body, link_open in cards
+    )
+    return _PAGE_TMPL.format(cards=cards_joined, **trans)
+
+
+def build_html(items: list[dict], lang: str = 'en') -> str:
+    """Build the complete HTML document for the news page.
+
+    Args:
+        items (list[dict]): List of article dictionaries to display.
+        lang (str): Language code ('en' or 'fa').  Determines text direction
+            and interface translations.
+
+    Returns:
+        str: A complete HTML document as a string.
+    """
+    trans = _TRANS_FA if lang == 'fa' else _TRANS_EN
+    return _build_page([_card_parts(art) for art in items], trans)
+
+
+def build_both(items: list[dict]) -> tuple[str, str]:
+    """Build the English and Farsi news pages from a single pass over the items.
+
+    Args:
+        items (list[dict]): List of article dictionaries to display.
+
+    Returns:
+        tuple[str, str]: The complete English and Farsi HTML documents.
+    """
+    # The card parts are language independent, so render them only once
+    cards = [_card_parts(art) for art in items]
+    return _build_page(cards, _TRANS_EN), _build_page(cards, _TRANS_FA)
+
+
 def main():
-    # Fetch and parse the feed
-    print("Fetching RSS feed from", FEED_URL)
-    feed_data = fetch_feed(FEED_URL)
-    items = parse_items(feed_data)
     # Prepare the output directory
     base_dir = os.path.dirname(os.path.abspath(__file__))
     en_path = os.path.join(base_dir, 'news.html')
     fa_path = os.path.join(base_dir, 'news-fa.html')
+    cache_path = os.path.join(base_dir, CACHE_FILENAME)
+    # Cached validators are only trustworthy while the pages they produced
+    # are still the ones on disk and were built by this version of the script
+    generator = generator_fingerprint()
+    cache = load_cache(cache_path)
+    if cache.get('generator') != generator or not pages_match_cache(cache, en_path, fa_path):
+        cache = {}
+    # Fetch and parse the feed
+    print("Fetching RSS feed from", FEED_URL)
+    feed_data, cache = fetch_feed(FEED_URL, cache)
+    if feed_data is None:
+        print("Feed not modified since last run; nothing to do.")
+        return
+    # Servers without (or with unreliable) validators still resend the same
+    # body, so compare its hash before doing any work
+    body_sha256 = hashlib.sha256(feed_data).hexdigest()
+    if body_sha256 == cache.get('body_sha256'):
+        save_cache(cache_path, cache)
+        print("Feed content unchanged since last run; nothing to do.")
+        return
+    items = parse_items(feed_data)
     # Build pages
-    en_html = build_html(items, lang='en')
-    fa_html = build_html(items, lang='fa')
-    # Write files
-    with open(en_path, 'w', encoding='utf-8') as f:
-        f.write(en_html)
-    with open(fa_path, 'w', encoding='utf-8') as f:
-        f.write(fa_html)
+    en_html, fa_html = build_both(items)
+    # Write files.  The two pages are independent, so they are written
+    # concurrently; the cache is saved last so it never refers to pages that
+    # were not written.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(write_atomic, [en_path, fa_path], [en_html, fa_html]))
+    cache['body_sha256'] = body_sha256
+    cache['generator'] = generator
+    cache['en_html'] = os.stat(en_path).st_mtime_ns
+    cache['fa_html'] = os.stat(fa_path).st_mtime_ns
+    save_cache(cache_path, cache)
     print(f"Generated {en_path} and {fa_path} with {len(items)} items.")
 
 